@@ -22,6 +22,7 @@ See Robert Cameron's original paper for a rigorous and detailed explanation of t
 """
 
 import re
+from functools import lru_cache
 
 #
 # XML shallow parsing expression pieces.
@@ -36,6 +37,15 @@ import re
 #    DT: DOCTYPE
 #   SPE: shallow parsing expression
 #    RE: regular expression
+#
+# A note on backtracking: the "Until" loops below (UntilHyphen, UntilRSBs,
+# UntilQMs and the continuation expressions built from them) are
+# unambiguous -- each repetition begins with a character the preceding run
+# cannot consume -- so a failed match backtracks in linear time and atomic
+# groups or possessive quantifiers would not change the complexity. What
+# can be quadratic is input containing many unterminated constructs (e.g.,
+# "<![CDATA[" with no "]]>"): each one scans to the end of the input before
+# settling for a shorter match.
 
 TextSE = "[^<]+"
 UntilHyphen = "[^-]*-"
@@ -44,9 +54,14 @@ CommentCE = Until2Hyphens + ">?"
 UntilRSBs = "[^\\]]*](?:[^\\]]+])*]+"
 CDATA_CE = UntilRSBs + "(?:[^\\]>]" + UntilRSBs + ")*>"
 S = "[ \\n\\t\\r]+"
-NameStrt = "[A-Za-z_:]|[^\\x00-\\x7F]"
-NameChar = "[A-Za-z0-9_:.-]|[^\\x00-\\x7F]"
-Name = "(?:" + NameStrt + ")(?:" + NameChar + ")*"
+# NameStrt and NameChar are REX's "[A-Za-z_:]|[^\\x00-\\x7F]" and
+# "[A-Za-z0-9_:.-]|[^\\x00-\\x7F]" written as single negated character
+# classes (excluding the ASCII characters that are not allowed), which the
+# regex engine matches with one set lookup per character rather than by
+# trying two alternatives.
+NameStrt = "[^\\x00-\\x39\\x3B-\\x40\\x5B-\\x5E\\x60\\x7B-\\x7F]"
+NameChar = "[^\\x00-\\x2C\\x2F\\x3B-\\x40\\x5B-\\x5E\\x60\\x7B-\\x7F]"
+Name = NameStrt + NameChar + "*"
 QuoteSE = "\"[^\"]*\"|'[^']*'"
 DT_IdentSE = S + Name + "(?:" + S + "(?:" + Name + "|" + QuoteSE + "))*"
 MarkupDeclCE = "(?:[^\\]\"'><]+|" + QuoteSE + ")*>"
@@ -57,10 +72,22 @@ DT_ItemSE = "<(?:!(?:--" + Until2Hyphens + ">|[^-]" + MarkupDeclCE + ")|\\?" + N
 DocTypeCE = DT_IdentSE + "(?:" + S + ")?(?:\\[(?:" + DT_ItemSE + ")*](?:" + S + ")?)?>?"
 DeclCE = "--(?:" + CommentCE + ")?|\\[CDATA\\[(?:" + CDATA_CE + ")?|DOCTYPE(?:" + DocTypeCE + ")?"
 PI_CE = Name + "(?:" + PI_Tail + ")?"
-EndTagCE = Name + "(?:" + S + ")?>?"
 AttValSE = "\"[^<\"]*\"|'[^<']*'"
-ElemTagCE = Name + "(?:" + S + Name + "(?:" + S + ")?=(?:" + S + ")?(?:" + AttValSE + "))*(?:" + S + ")?/?>?"
-MarkupSPE = "<(?:!(?:" + DeclCE + ")?|\\?(?:" + PI_CE + ")?|/(?:" + EndTagCE + ")?|(?:" + ElemTagCE + ")?)"
+
+def assemble_markup_spe(ElemName=Name):
+    """
+    Assemble the expressions that depend on how element names are matched,
+    returning (EndTagCE, ElemTagCE, MarkupSPE). ElemName is the expression
+    used for the names in start, end, and empty tags (but not for attribute
+    names, PI targets, or DOCTYPE names).
+
+    """
+    EndTagCE = ElemName + "(?:" + S + ")?>?"
+    ElemTagCE = ElemName + "(?:" + S + Name + "(?:" + S + ")?=(?:" + S + ")?(?:" + AttValSE + "))*(?:" + S + ")?/?>?"
+    MarkupSPE = "<(?:!(?:" + DeclCE + ")?|\\?(?:" + PI_CE + ")?|/(?:" + EndTagCE + ")?|(?:" + ElemTagCE + ")?)"
+    return EndTagCE, ElemTagCE, MarkupSPE
+
+EndTagCE, ElemTagCE, MarkupSPE = assemble_markup_spe()
 
 # The XML shallow parsing expression as a string.
 XML_SPE = TextSE + "|" + MarkupSPE
@@ -68,6 +95,14 @@ XML_SPE = TextSE + "|" + MarkupSPE
 # The XML shallow parsing expression as a compiled regex.
 XML_SPE_ = re.compile(XML_SPE)
 
+# XML_SPE_b_, the XML shallow parsing expression compiled for bytes, is
+# compiled on first access; see __getattr__ at the end of the module.
+
+# Bound methods of the compiled expression, saving an attribute lookup per
+# call in the shallow parsing functions below.
+_findall = XML_SPE_.findall
+_finditer = XML_SPE_.finditer
+
 #
 # Shallow parsing functions.
 #
@@ -79,31 +114,113 @@ def shallow_parse(s):
     ['<p>', 'some text', '</p>']
 
     """
-    return re.findall(XML_SPE, s)
+    return _findall(s)
 
 def shallow_iterparse(s):
     """
     Shallow parse, returning an iterator of re match objects.
 
     >>> rex.shallow_iterparse('<p>some text</p>')
-    <callable-iterator object at ...>
+    <callable_iterator object at ...>
     >>> list(rex.shallow_iterparse(s))
-    [<_sre.SRE_Match object at ...>,
-    <_sre.SRE_Match object at ...>,
-    <_sre.SRE_Match object at ...>]
+    [<re.Match object; span=(0, 3), match='<p>'>,
+    <re.Match object; span=(3, 12), match='some text'>,
+    <re.Match object; span=(12, 16), match='</p>'>]
 
     """
-    return re.finditer(XML_SPE, s)
+    return _finditer(s)
+
+def shallow_parse_bytes(buf):
+    """
+    Shallow parse UTF-8 (or other ASCII-compatible) encoded bytes, returning a
+    list of token byte strings.
+
+    >>> rex.shallow_parse_bytes(b'<p>some text</p>')
+    [b'<p>', b'some text', b'</p>']
+
+    """
+    SPE_b_ = globals().get('XML_SPE_b_') or __getattr__('XML_SPE_b_')
+    return SPE_b_.findall(buf)
+
+def build_specialized_parser(tagset):
+    """
+    Return a compiled shallow parsing expression that only recognizes tags
+    whose names are in tagset, for use as tokenize()'s SPE_ argument when
+    the element names of a document are known in advance.
+
+    Names are matched as a literal alternation (longest first) rather than
+    with the general Name expression. A tag whose name is not in tagset is
+    not recognized as markup and will be tokenized as an Error token.
+
+    Parsers are cached by tagset, so calling this repeatedly with the same
+    names is cheap.
+
+    >>> SPE_ = rex.build_specialized_parser(['p', 'i'])
+    >>> SPE_.findall('<p>some <i>text</i></p><b>')
+    ['<p>', 'some ', '<i>', 'text', '</i>', '</p>', '<', 'b>']
+
+    """
+    if isinstance(tagset, str):
+        raise TypeError('tagset must be a collection of names, not a string')
+    return _build_specialized_parser(frozenset(tagset))
+
+@lru_cache(maxsize=256)
+def _build_specialized_parser(names):
+    """Compile the parser for build_specialized_parser(), given a frozenset."""
+    if not names:
+        raise ValueError('tagset must contain at least one name')
+    names = sorted(names, key=len, reverse=True)
+    # The negative lookahead keeps a name from matching a prefix of a
+    # longer name that's not in tagset.
+    ElemName = "(?:" + "|".join(re.escape(name) for name in names) + ")(?!" + NameChar + ")"
+    MarkupSPE = assemble_markup_spe(ElemName)[2]
+    return re.compile(TextSE + "|" + MarkupSPE)
 
 #
 # Other expressions developed in the REX paper (named groups added).
 #
+# The compiled expressions below are compiled once; use them directly rather
+# than recompiling their patterns. ElemTagRE_ and AttRE_ aren't used by
+# rexlib itself, so they're compiled on first access (see __getattr__) rather
+# than at import.
+#
 ElemTagRE = "<(?P<name>" + Name + ")(?P<attributes>(?:" + S + Name + "(?:" + S + ")?=(?:" + S + ")?(?:" + AttValSE + "))*)(" + S + ")?/?>"
-ElemTagRE_ = re.compile(ElemTagRE)
 
 #
 # Useful fragments (named groups added).
 #
 AttRE = "(?P<attribute>" + S + "(?P<attribute_name>" + Name + ")(?:" + S + ")?=(?:" + S + ")?(?P<attribute_value>" + AttValSE + "))"
-AttRE_ = re.compile(AttRE)
 
+# AttRE, but also matching an attribute at the very start of the string
+# without preceding whitespace (for scanning PI instructions as is).
+AttRE_at_start = "(?P<attribute>(?:^|" + S + ")(?P<attribute_name>" + Name + ")(?:" + S + ")?=(?:" + S + ")?(?P<attribute_value>" + AttValSE + "))"
+AttRE_at_start_ = re.compile(AttRE_at_start)
+
+# Compiled expressions built on first access, by name, from their patterns.
+_lazy_expressions = {
+    'ElemTagRE_': ElemTagRE,
+    'AttRE_': AttRE,
+    # For scanning UTF-8 encoded input without decoding it first. NameStrt
+    # and NameChar accept any non-ASCII character, so in bytes they accept
+    # the lead and continuation bytes of any multibyte UTF-8 sequence.
+    'XML_SPE_b_': XML_SPE.encode('ascii'),
+}
+
+def __getattr__(name):
+    try:
+        pattern = _lazy_expressions[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    compiled = globals()[name] = re.compile(pattern)
+    return compiled
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_expressions))
+
+# The module's public names, including the lazily compiled expressions (which
+# "from rexlib.rex import *" would otherwise miss).
+__all__ = sorted(
+    set(name for name in globals()
+        if not name.startswith('_') and name not in ('re', 'lru_cache'))
+    | set(_lazy_expressions)
+)
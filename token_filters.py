@@ -3,11 +3,12 @@ Some simple REX filters.
 
 """
 
-from collections import OrderedDict
-
 from .tokens import *
 
-__all__ = ['concat_tokens', 'wellformedness_check', 'expand_empty_tags', 'find_all_contexts']
+__all__ = [
+    'concat_tokens', 'process_tokens', 'wellformedness_check', 'expand_empty_tags',
+    'find_all_contexts'
+]
 
 
 def concat_tokens(tokens, token_filter=None):
@@ -32,7 +33,7 @@ def concat_tokens(tokens, token_filter=None):
     """
     # The following assertion is to aid in debugging a common but
     # difficult-to-pinpoint programming mistake.
-    assert not isinstance(tokens, (str, unicode)), (
+    assert not isinstance(tokens, str), (
         'concat_tokens() was passed a string rather than a sequence of tokens.\n\n  tokens[:100]:\n    %s'
         % repr(tokens[:100])
     )
@@ -41,31 +42,71 @@ def concat_tokens(tokens, token_filter=None):
             return ''.join([token.xml for token in tokens if isinstance(token, token_filter)])
         else:
             return ''.join([token.xml for token in tokens])
-    except AttributeError, value:
+    except AttributeError as value:
         raise RexlibError('An AttributeError was raised in concat_tokens(): %s' % value)
 
 
-def wellformedness_check(tokens):
+def process_tokens(tokens, keep_minimized=None, check=True, expand=True):
     """
-    A filter that ensures tags nest correctly and no Error tokens are present.
+    A filter combining wellformedness_check() and expand_empty_tags() in a
+    single pass.
+
+    If check is true, ensures tags nest correctly and no Error tokens are
+    present. If expand is true, expands XML empty tags (<empty/>) to a
+    start-end pair (<empty></empty>) unless the element name is in
+    keep_minimized.
+
+        process_tokens(tokens, keep_minimized)
+
+    yields the same tokens as
+
+        expand_empty_tags(wellformedness_check(tokens), keep_minimized)
+
+    but without a second generator frame to pass through per token.
 
     """
+    # This loop runs once per token, so the stack methods are bound locally
+    # and tokens are dispatched on their integer kind rather than with
+    # token.is_a() or isinstance() tests.
+    tokens = iter(tokens)
     stack = []
+    push, pop = stack.append, stack.pop
     for token in tokens:
-        if token.is_a(Start):
-            stack.append(token)
-        elif token.is_a(End):
-            try:
-                start = stack.pop()
-            except IndexError:
-                raise WellformednessError('Extra end tag found: "%s"' % token.xml)
-            if start.name != token.name:
-                raise WellformednessError('"%s" matched by "%s"' % (start.xml, token.xml))
-        elif token.is_a(Error):
-            raise MarkupError(token.xml + tokens.next().xml)
+        kind = token.kind
+        if kind == START:
+            if check:
+                push(token)
+        elif kind == END:
+            if check:
+                try:
+                    start = pop()
+                except IndexError:
+                    raise WellformednessError('Extra end tag found: "%s"' % token.xml)
+                if start.name != token.name:
+                    raise WellformednessError('"%s" matched by "%s"' % (start.xml, token.xml))
+        elif kind == EMPTY:
+            if expand and not (keep_minimized and token.name in keep_minimized):
+                # Only the "/" of the closing "/>" is dropped; attribute values
+                # may contain slashes too.
+                xml = token.xml
+                yield Start(xml[:xml.rfind('/>')] + '>')
+                yield End('</%s>' % token.name)
+                continue
+        elif kind == ERROR:
+            if check:
+                following = next(tokens, None)
+                raise MarkupError(token.xml + (following.xml if following else ''))
         yield token
 
 
+def wellformedness_check(tokens):
+    """
+    A filter that ensures tags nest correctly and no Error tokens are present.
+
+    """
+    return process_tokens(tokens, expand=False)
+
+
 def expand_empty_tags(tokens, keep_minimized=None):
     """
     Expands XML empty tags (<empty/>) to a start-end pair (<empty></empty>)
@@ -80,31 +121,24 @@ def expand_empty_tags(tokens, keep_minimized=None):
     others expressed as a start-end pair.
 
     """
-    for token in tokens:
-        if isinstance(token, Empty):
-            if keep_minimized and token.name in keep_minimized:
-                yield token
-            else:
-                token.__class__ = Start
-                token.reserialize()
-                yield Start(token.xml.replace('/', ''))
-                yield End('</%s>' % token.name)
-        else:
-            yield token
+    return process_tokens(tokens, keep_minimized, check=False)
 
 
 def find_all_contexts(tokens):
     """Return a set of unique XML paths found in tokens."""
-    stack = []
-    contexts = OrderedDict()
+    # Each entry of paths is the full path of an open element, so a child's
+    # path is built from its parent's rather than by rejoining the stack.
+    paths = []
+    push, pop = paths.append, paths.pop
+    contexts = {}
     for token in tokens:
-        if token.is_a(StartOrEmpty):
-            stack.append(token.name)
-            path = '/'.join(stack)
+        kind = token.kind
+        if kind == START or kind == EMPTY:
+            path = paths[-1] + '/' + token.name if paths else token.name
             if path not in contexts:
                 contexts[path] = None
-            if token.is_a(Empty):
-                stack.pop()
-        elif token.is_a(End):
-            stack.pop()
-    return contexts.keys()
+            if kind == START:
+                push(path)
+        elif kind == END:
+            pop()
+    return list(contexts)
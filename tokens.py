@@ -9,17 +9,26 @@ The property idiom used in this module is discussed here:
 
 import re
 import sys
-from collections import OrderedDict
 
-from .rex import XML_SPE_, ElemTagRE_, AttRE_
+from .rex import XML_SPE_, AttRE_at_start_
 
 __all__ = [
     'Cdata', 'Comment', 'Doctype', 'Empty', 'End', 'Error', 'PI', 'Start', 'StartOrEmpty', 'Tag',
     'Text', 'Token', 'XmlDecl',
     'tokenize',
+    'OTHER', 'START', 'END', 'EMPTY', 'ERROR',
     'RexlibError', 'MarkupError', 'WellformednessError', 'SecondaryParsingError'
 ]
 
+#
+# Token kinds
+#
+
+# Integer codes stored in each token class's kind attribute. Comparing
+# token.kind against these is cheaper than an isinstance() test, which
+# matters in filters that dispatch on every token.
+OTHER, START, END, EMPTY, ERROR = range(5)
+
 #
 # Token Classes
 #
@@ -30,7 +39,8 @@ class Token(object):
 
     """
     __slots__ = ['xml']
-    template = NotImplemented
+    template = None
+    kind = OTHER
     # TODO: Move encoding to tokenizer function(s).
     encoding = sys.getdefaultencoding()
 
@@ -52,9 +62,8 @@ class Token(object):
         text = self.xml
         MAX_REPR_WIDTH = self.MAX_REPR_WIDTH
         if MAX_REPR_WIDTH is not None and len(text) > MAX_REPR_WIDTH:
-            text = '{0}...'.format(text[:MAX_REPR_WIDTH])
-        return '{self.__class__.__name__}({text!r})'.format(
-            self=self, text=text)
+            text = text[:MAX_REPR_WIDTH] + '...'
+        return f'{type(self).__name__}({text!r})'
 
     def is_a(self, token_class, *_not_used):
         """
@@ -71,7 +80,20 @@ class Token(object):
     def reserialize(self):
         """
         Update self.xml based on internal state.
+
+        If the class attribute template is set, it's used as a format string
+        (with the token passed in as self); otherwise the token class's own
+        serialization is used.
+
         """
+        template = self.template
+        if template is None:
+            self.xml = self._serialize()
+        else:
+            self.xml = template.format(self=self)
+
+    def _serialize(self):
+        """Return the serialization of the token's internal state."""
         raise NotImplementedError
 
 
@@ -100,7 +122,7 @@ class Tag(Token):
 
     def is_a(self, token_class, *names):
         return (isinstance(self, token_class)
-                and (not names or self.name in names))
+                and (not names or self._name in names))
 
     @property
     def name(self):
@@ -117,20 +139,18 @@ class Tag(Token):
     @property
     def ns_prefix(self):
         """ns_prefix property: namespace prefix of qualified tag name"""
-        qname = self._name
-        return ':' in qname and qname.split(':')[0] or ''
+        prefix, colon, name = self._name.partition(':')
+        return prefix if colon else ''
 
     @ns_prefix.setter
     def ns_prefix(self, prefix):
-        qname = self._name
-        if ':' in qname:
-            old_prefix, name = qname.split(':', 1)
-        else:
-            old_prefix, name = '', qname
+        old_prefix, colon, name = self._name.partition(':')
+        if not colon:
+            old_prefix, name = '', old_prefix
         if old_prefix != prefix:
             # Don't reserialize needlessly.
             if prefix:
-                self._name = '{prefix}:{name}'.format(**locals())
+                self._name = f'{prefix}:{name}'
             else:
                 self._name = name
             self.reserialize()
@@ -140,17 +160,42 @@ class StartOrEmpty(Tag):
     """
     Abstract superclass for Start and Empty
 
+    Attributes aren't parsed until the attributes property is first read
+    (directly, or by item access or reserialization).
+
     """
-    __slots__ = ['attributes']
+    __slots__ = ['_attributes']
 
     def __init__(self, xml):
         self.xml = xml
-        # Parse element name and attributes.
-        m = ElemTagRE_.search(xml)
-        self._name = m.group('name')
-        self.attributes = attributes = AttributeDict(token=self)
-        for m in AttRE_.finditer(m.group('attributes')):
-            attributes[m.group('attribute_name')] = m.group('attribute_value')[1:-1]
+        # Tag names and attribute names are interned: a document repeats a
+        # few of them many times over.
+        self._name = sys.intern(xml[1:_start_tag_name_end(xml)])
+        self._attributes = None
+
+    @property
+    def attributes(self):
+        """attributes property: an AttributeDict of the tag's attributes"""
+        attributes = self._attributes
+        if attributes is None:
+            xml, name = self.xml, self._name
+            # The attributes follow the name, unless the name has been
+            # changed since xml was last serialized.
+            name_end = len(name) + 1
+            if not (xml.startswith(name, 1) and xml[name_end] in _WHITESPACE + '/>'):
+                name_end = _start_tag_name_end(xml)
+            self._attributes = attributes = AttributeDict(token=self)
+            # Bypass AttributeDict.__setitem__ so that building the
+            # attributes doesn't reserialize the token (xml is still the
+            # original tag).
+            setitem, intern = dict.__setitem__, sys.intern
+            for attribute_name, attribute_value in _parse_start_tag_attributes(xml, name_end):
+                setitem(attributes, intern(attribute_name), attribute_value)
+        return attributes
+
+    @attributes.setter
+    def attributes(self, attributes):
+        self._attributes = attributes
 
     def __getitem__(self, attribute_name):
         return self.attributes.get(attribute_name)
@@ -179,9 +224,6 @@ class StartOrEmpty(Tag):
         """
         self.attributes.set_attribute_order(attribute_order, sort)
 
-    def reserialize(self):
-        self.xml = self.template.format(self=self)
-
 
 class Start(StartOrEmpty):
     """
@@ -189,11 +231,14 @@ class Start(StartOrEmpty):
 
     """
     __slots__ = []
-    template = '<{self.name}{self.attributes.to_xml}>'
+    kind = START
 
     def __init__(self, xml):
         super(Start, self).__init__(xml)
 
+    def _serialize(self):
+        return f'<{self._name}{self.attributes._serialize()}>'
+
 
 class Empty(StartOrEmpty):
     """
@@ -201,11 +246,14 @@ class Empty(StartOrEmpty):
 
     """
     __slots__ = []
-    template = '<{self.name}{self.attributes.to_xml}/>'
+    kind = EMPTY
 
     def __init__(self, xml):
         super(Empty, self).__init__(xml)
 
+    def _serialize(self):
+        return f'<{self._name}{self.attributes._serialize()}/>'
+
 
 class End(Tag):
     """
@@ -213,14 +261,14 @@ class End(Tag):
 
     """
     __slots__ = []
-    template = '</{self.name}>'
+    kind = END
 
     def __init__(self, xml):
         self.xml = xml
-        self._name = xml.split('/')[1][:-1].strip()
+        self._name = sys.intern(xml[2:-1].strip())
 
-    def reserialize(self):
-        self.xml = self.template.format(self=self)
+    def _serialize(self):
+        return f'</{self._name}>'
 
 
 class Comment(Token):
@@ -229,14 +277,13 @@ class Comment(Token):
 
     """
     __slots__ = ['_content']
-    template = '<!--{self.content}-->'
 
     def __init__(self, xml):
         self.xml = xml
         self._content = xml[4:-3]
 
-    def reserialize(self):
-        self.xml = self.template.format(self=self)
+    def _serialize(self):
+        return f'<!--{self._content}-->'
 
     @property
     def content(self):
@@ -255,7 +302,6 @@ class PI(Token):
 
     """
     __slots__ = ['_target', '_instruction', '_pseudoattributes']
-    template = '<?{self.target}{self.space}{self.instruction}?>'
 
     def __init__(self, xml):
         self.xml = xml
@@ -294,13 +340,12 @@ class PI(Token):
             self._parse_pseudoattributes()
         self._pseudoattributes[attribute_name] = value
         span = self._pseudoattributes.spans.get(attribute_name)
+        instruction = self._instruction
         if span:
             i, j = span
-            l = list(self._instruction)
-            l[i:j] = ' {attribute_name}="{value}"'.format(**locals())
-            self._instruction = ''.join(l)
+            self._instruction = f'{instruction[:i]} {attribute_name}="{value}"{instruction[j:]}'
         else:
-            self._instruction += ' {attribute_name}="{value}"'.format(**locals())
+            self._instruction = f'{instruction} {attribute_name}="{value}"'
 
         self._locate_pseudoattributes()
         self.reserialize()
@@ -312,9 +357,7 @@ class PI(Token):
         del self._pseudoattributes[attribute_name]
         span = self._pseudoattributes.spans[attribute_name]
         i, j = span
-        l = list(self._instruction)
-        del l[i:j]
-        self._instruction = ''.join(l)
+        self._instruction = self._instruction[:i] + self._instruction[j:]
 
         self._locate_pseudoattributes()
         self.reserialize()
@@ -348,23 +391,22 @@ class PI(Token):
         pseudoattributes = self._pseudoattributes
         if pseudoattributes:
             # Clear any previous values.
-            pseudoattributes.clear()
+            dict.clear(pseudoattributes)
+            pseudoattributes._xml_cache = None
             spans.clear()
 
-        # Regex AttRE_, requires initial whitespace to match, hence the added
-        # ' ', below.
-        for m in AttRE_.finditer(' ' + self._instruction):
+        # Pseudoattributes are stored with dict.__setitem__, bypassing the
+        # reserialization AttributeDict.__setitem__ would trigger.
+        setitem = dict.__setitem__
+
+        # Unlike AttRE_, AttRE_at_start_ matches an attribute at the start of
+        # the instruction, so the instruction can be scanned as is.
+        for m in AttRE_at_start_.finditer(self._instruction):
             attribute_name = m.group('attribute_name')
-            pseudoattributes[attribute_name] = m.group('attribute_value')[1:-1]  # strip delimeters
+            setitem(pseudoattributes, attribute_name, m.group('attribute_value')[1:-1])  # strip delimeters
             # Get the span for the attribute using the 'attribute' named group,
             # which includes the preceding whitespace.
-            i, j = m.span('attribute')
-            # Compensate span for initial space added above.
-            if i - 1 < 0:
-                # avoid negative slices
-                spans[attribute_name] = (0, j - 1)
-            else:
-                spans[attribute_name] = (i - 1, j - 1)
+            spans[attribute_name] = m.span('attribute')
 
     def reserialize(self):
         """
@@ -373,11 +415,16 @@ class PI(Token):
 
         """
         self._instruction = self._instruction.lstrip()
-        self.xml = self.template.format(self=self)
+        super(PI, self).reserialize()
+
+    def _serialize(self):
+        if self._instruction:
+            return f'<?{self._target} {self._instruction}?>'
+        return f'<?{self._target}?>'
 
     def is_a(self, token_class, *targets):
         return (isinstance(self, token_class)
-                and (not targets or self.target in targets))
+                and (not targets or self._target in targets))
 
     @property
     def target(self):
@@ -424,8 +471,7 @@ class XmlDecl(PI):
             Token.encoding = encoding
 
 
-doctype_parser_ = re.compile("""\
-(?xs)
+doctype_parser_ = re.compile(r"""(?xs)
 <!DOCTYPE\s+(?P<document_element>\S+)
 (?:(?:\s+(?P<id_type>SYSTEM|PUBLIC))(?:\s+(?P<delim>["'])
 (?P<id_value>.*?)(?P=delim))?)?
@@ -451,32 +497,29 @@ class Doctype(Token):
     """
     __slots__ = ['_document_element', '_id_type', '_id_value',
                  '_internal_subset']
-    template = '<!DOCTYPE {0}>'
 
     def __init__(self, xml):
         self.xml = xml
         m = doctype_parser_.search(xml)
         if m:
-            d = m.groupdict()
-            self._document_element = d['document_element']
-            self._id_type = d['id_type'] or ''
-            self._id_value = d['id_value'] or ''
-            self._internal_subset = d['internal_subset'] or ''
+            (self._document_element, id_type, id_value,
+             internal_subset) = m.group('document_element', 'id_type',
+                                        'id_value', 'internal_subset')
+            self._id_type = id_type or ''
+            self._id_value = id_value or ''
+            self._internal_subset = internal_subset or ''
         else:
-            raise SecondaryParsingError(
-                'unexpected DOCTYPE found: {self.xml}'
-                .format(self=self)
-            )
+            raise SecondaryParsingError(f'unexpected DOCTYPE found: {xml}')
 
-    def reserialize(self):
-        l = [self.document_element]
+    def _serialize(self):
+        l = [self._document_element]
         if self._id_type:
             l.append(self._id_type)
         if self._id_value:
-            l.append('"{self._id_value}"'.format(self=self))
+            l.append(f'"{self._id_value}"')
         if self._internal_subset:
-            l.append('[{self._internal_subset}]'.format(self=self))
-        self.xml = self.template.format(' '.join(l))
+            l.append(f'[{self._internal_subset}]')
+        return f'<!DOCTYPE {" ".join(l)}>'
 
     @property
     def document_element(self):
@@ -525,14 +568,13 @@ class Cdata(Token):
 
     """
     __slots__ = ['_content']
-    template = '<![CDATA[{self.content}]]>'
 
     def __init__(self, xml):
         self.xml = xml
         self._content = self.xml[9:-3]
 
-    def reserialize(self):
-        self.xml = self.template.format(self=self)
+    def _serialize(self):
+        return f'<![CDATA[{self._content}]]>'
 
     @property
     def content(self):
@@ -562,6 +604,7 @@ class Error(Token):
 
     """
     __slots__ = ['span', 'line', 'column']
+    kind = ERROR
 
     def __init__(self, xml, span, line=None, column=None):
         self.xml = xml
@@ -578,13 +621,10 @@ class Error(Token):
 # Utility classes
 #
 
-class AttributeDict(OrderedDict):
+class AttributeDict(dict):
     """
-    A dictionary that preserves the order in which attributes are added.
-    If the constructor is passed a dictionary with attributes, the order
-    for those attributes will be random; however, attributes added
-    subsequently will be ordered following the initial population of
-    attributes.
+    A dictionary of attributes, which (like any dict) preserves the order in
+    which attributes are added.
 
     self.token is a reference back to the Start or Empty token that
     instantiated the AttributeDict; it's used to trigger re-serialization
@@ -593,26 +633,111 @@ class AttributeDict(OrderedDict):
     """
     def __init__(self, d=None, token=None):
         self.token = token
+        # Serialization cached by _serialize(); reset whenever the
+        # attributes change.
+        self._xml_cache = None
         if d is None:
             d = {}
-        OrderedDict.__init__(self, d)
+        dict.__init__(self, d)
 
     def __setitem__(self, key, item):
-        OrderedDict.__setitem__(self, key, item)
+        dict.__setitem__(self, key, item)
+        self._xml_cache = None
         if self.token:
             self.token.reserialize()
 
-    def __missing__(self, key):
-        """Set a default for missing key, rather than raising an exception."""
-        return ''
+    def update(self, *args, **kwargs):
+        # dict.update() doesn't go through __setitem__.
+        dict.update(self, *args, **kwargs)
+        self._xml_cache = None
+        if self.token:
+            self.token.reserialize()
+
+    def __ior__(self, other):
+        # Nor does dict.__ior__() (d |= other).
+        self.update(other)
+        return self
+
+    def __or__(self, other):
+        # As with OrderedDict, d | other returns a new instance of the
+        # class, which isn't attached to a token.
+        if not isinstance(other, dict):
+            return NotImplemented
+        new = self.__class__(self)
+        dict.update(new, other)
+        return new
+
+    def __ror__(self, other):
+        if not isinstance(other, dict):
+            return NotImplemented
+        new = self.__class__(other)
+        dict.update(new, self)
+        return new
+
+    def setdefault(self, key, default=None):
+        # Nor does dict.setdefault().
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def copy(self):
+        # dict.copy() would return a plain dict. As with OrderedDict.copy(),
+        # the copy isn't attached to a token.
+        return self.__class__(self)
 
     def __delitem__(self, key):
         """Remove items without raising exceptions."""
         if key in self:
-            OrderedDict.__delitem__(self, key)
+            dict.__delitem__(self, key)
+            self._xml_cache = None
             if self.token:
                 self.token.reserialize()
 
+    def pop(self, key, *default):
+        item = dict.pop(self, key, *default)
+        self._xml_cache = None
+        if self.token:
+            self.token.reserialize()
+        return item
+
+    def popitem(self, last=True):
+        """Remove and return the last (or, if last is false, first) item."""
+        if last:
+            item = dict.popitem(self)
+        else:
+            if not self:
+                raise KeyError('dictionary is empty')
+            key = next(iter(self))
+            item = key, dict.pop(self, key)
+        self._xml_cache = None
+        if self.token:
+            self.token.reserialize()
+        return item
+
+    def move_to_end(self, key, last=True):
+        """
+        Move an existing attribute to the end (or, if last is false, the
+        beginning).
+
+        """
+        item = dict.pop(self, key)
+        if last:
+            dict.__setitem__(self, key, item)
+        else:
+            items = list(self.items())
+            dict.clear(self)
+            dict.__setitem__(self, key, item)
+            dict.update(self, items)
+        self._xml_cache = None
+        if self.token:
+            self.token.reserialize()
+
+    def clear(self):
+        dict.clear(self)
+        self._xml_cache = None
+        if self.token:
+            self.token.reserialize()
+
     def set_attribute_order(self, attribute_order=None, sort=False):
         """
         Re-order attributes based on attribute_order list. Any attributes
@@ -622,22 +747,24 @@ class AttributeDict(OrderedDict):
         order.
 
         """
-        d = OrderedDict(self)
-        self.clear()
+        d = dict(self)
+        dict.clear(self)
+        # The token is reserialized once, below, rather than per attribute.
+        setitem = dict.__setitem__
         if attribute_order:
             for attribute_name in attribute_order:
                 if attribute_name in d:
-                    self[attribute_name] = d[attribute_name]
-                    d.pop(attribute_name)
+                    setitem(self, attribute_name, d.pop(attribute_name))
         if sort and d:
             # Do a case-insensitive sort on remaining attributes.
             for key in sorted(d, key=str.lower):
-                self[key] = d[key]
+                setitem(self, key, d[key])
         elif d:
             # If there are any remaining attribute names in d, add them now.
             for key in d:
-                self[key] = d[key]
+                setitem(self, key, d[key])
         del d
+        self._xml_cache = None
         if self.token:
             self.token.reserialize()
 
@@ -652,24 +779,28 @@ class AttributeDict(OrderedDict):
         escaped as &quot;.
 
         """
-        try:
-            return ''.join(
-                ' {attribute_name}="{attribute_value}"'
-                .format(
-                    attribute_name=attribute_name,
-                    attribute_value=attribute_value.replace('"', '&quot;')
-                )
-                for attribute_name, attribute_value in self.items()
-            )
-        except AttributeError:
-            raise RexlibError(
-                'Attribute value was not a string: {self}'
-                .format(self=self)
-            )
+        return self._serialize()
+
+    def _serialize(self):
+        """Return the serialization used by to_xml."""
+        xml = self._xml_cache
+        if xml is not None:
+            return xml
+        pieces = []
+        append = pieces.append
+        for attribute_name, attribute_value in self.items():
+            if not isinstance(attribute_value, str):
+                raise RexlibError(f'Attribute value was not a string: {self}')
+            if '"' in attribute_value:
+                attribute_value = attribute_value.replace('"', '&quot;')
+            append(f' {attribute_name}="{attribute_value}"')
+        self._xml_cache = xml = ''.join(pieces)
+        return xml
 
     def has_key_nocase(self, key):
         """A case-insensitive version of 'attribute_name' in self."""
-        return key.lower() in [k.lower() for k in self]
+        key = key.lower()
+        return any(k.lower() == key for k in self)
 
 
 #
@@ -688,25 +819,28 @@ class RexlibError(Exception):
 class MarkupError(RexlibError):
     """Used for syntax errors in markup."""
     def __str__(self):
-        return 'Syntax error in markup: "{self.val}"'.format(self=self)
+        return f'Syntax error in markup: "{self.val}"'
 
 
 class WellformednessError(RexlibError):
     """Used for tag-nesting errors."""
     def __str__(self):
-        return 'Wellformedness error: "{self.val}"'.format(self=self)
+        return f'Wellformedness error: "{self.val}"'
 
 
 class SecondaryParsingError(RexlibError):
     """Used to indicate errors during secondary parsing."""
     def __str__(self):
-        return 'Secondary parsing error: "{self.val}"'.format(self=self)
+        return f'Secondary parsing error: "{self.val}"'
 
 
 #
 # The tokenizer
 #
 
+_XMLDECL_PREFIX = '<?xml '
+
+
 def tokenize(input, SPE_=XML_SPE_, error_stream=sys.stderr):
     """
     A generator function for classifying each token matched by the REX shallow
@@ -715,13 +849,15 @@ def tokenize(input, SPE_=XML_SPE_, error_stream=sys.stderr):
     Set SPE_=SGML_SPE_ to tokenize SGML.
 
     """
-    tokenizer = SPE_.finditer
-    for m in tokenizer(input):
+    # Token classes are bound to locals, saving a global lookup per token.
+    text, start, empty, end = Text, Start, Empty, End
+    comment, cdata, doctype, xml_decl, pi = Comment, Cdata, Doctype, XmlDecl, PI
+    for m in SPE_.finditer(input):
         xml = m.group(0)
 
         if xml[0] != '<':
             # Token is text
-            yield Text(xml)
+            yield text(xml)
 
         else:
             if xml[-1] == '>':
@@ -730,26 +866,30 @@ def tokenize(input, SPE_=XML_SPE_, error_stream=sys.stderr):
 
                 if c not in '/!?':
                     if xml[-2] == '/':
-                        yield Empty(xml)
+                        yield empty(xml)
                     else:
-                        yield Start(xml)
+                        yield start(xml)
 
                 elif c == '/':
-                    yield End(xml)
+                    yield end(xml)
 
                 elif c == '!':
-                    if xml.startswith('<!--'):
-                        yield Comment(xml)
-                    elif xml[2] == '[':
-                        yield Cdata(xml)
-                    elif xml.startswith('<!DOCTYPE'):
-                        yield Doctype(xml)
+                    # REX only matches a complete "<!...>" for comments,
+                    # CDATA sections, and DOCTYPE declarations, so the third
+                    # character is enough to tell them apart.
+                    c = xml[2]
+                    if c == '-':
+                        yield comment(xml)
+                    elif c == '[':
+                        yield cdata(xml)
+                    elif c == 'D':
+                        yield doctype(xml)
 
                 elif c == '?':
-                    if xml.startswith('<?xml '):
-                        yield XmlDecl(xml)
+                    if xml[:6] == _XMLDECL_PREFIX:
+                        yield xml_decl(xml)
                     else:
-                        yield PI(xml)
+                        yield pi(xml)
             else:
                 # REX's error condition (a markup item not ending with '>').
                 yield Error(xml, span=m.span())
@@ -797,6 +937,55 @@ def tokenize(input, SPE_=XML_SPE_, error_stream=sys.stderr):
 # Utility functions
 #
 
+_WHITESPACE = ' \n\t\r'
+
+def _start_tag_name_end(xml):
+    """
+    Return the offset of the end of the name in a start or empty tag: the
+    name runs up to the first whitespace character, if any, or else to the
+    closing "/>" or ">".
+
+    """
+    name_end = len(xml) - 2 if xml[-2] == '/' else len(xml) - 1
+    for c in _WHITESPACE:
+        i = xml.find(c, 1, name_end)
+        if i >= 0:
+            name_end = i
+    return name_end
+
+
+def _parse_start_tag_attributes(xml, name_end):
+    """
+    Return the attributes of a start or empty tag, whose name ends at offset
+    name_end, as a list of (attribute_name, attribute_value) pairs, with
+    attribute value delimiters removed.
+
+    This does the work of matching ElemTagRE_ and then AttRE_ against the
+    tag's attributes, but with string methods, which is considerably faster
+    for tags as matched by the REX shallow parsing expression.
+
+    """
+    stop = len(xml) - 2 if xml[-2] == '/' else len(xml) - 1
+    attributes = []
+    find = xml.find
+    p = name_end
+    while True:
+        eq = find('=', p, stop)
+        if eq < 0:
+            break
+        q = eq + 1
+        while xml[q] in _WHITESPACE:
+            q += 1
+        delim = xml[q]
+        if delim not in '"\'':
+            raise SecondaryParsingError(
+                f'unquoted attribute value found: {xml}')
+        end = xml.index(delim, q + 1)
+        attributes.append((xml[p:eq].strip(_WHITESPACE), xml[q + 1:end]))
+        p = end + 1
+    return attributes
+
+
 def pprint_error_context(m, msg, context_size=30):
     """
     Prettyprint a markup error's context.
@@ -817,17 +1006,8 @@ def pprint_error_context(m, msg, context_size=30):
     if end + context_size < len(s):
         end_ellipsis = '...'
 
-    before = repr(
-        '{0}"{1}'.format(start_ellipsis, s[start:end])
-    )[1:-1]
-
-    after = repr(
-        '{0}"{1}' .format(s[end:end + context_size], end_ellipsis)
-    )[1:-1]
-
+    before = repr(f'{start_ellipsis}"{s[start:end]}')[1:-1]
+    after = repr(f'{s[end:end + context_size]}"{end_ellipsis}')[1:-1]
     indent = ' ' * len(before)
 
-    return (
-        '\n    {msg}:\n    {before}\n    {indent}{after}\n'
-        .format(**locals())
-    )
+    return f'\n    {msg}:\n    {before}\n    {indent}{after}\n'